@@ -88,7 +88,7 @@ sleep 35 # Give Azure time to provision the new revision
 
 print_step "7" "Verifying deployment..."
 HEALTH_CHECK_RESPONSE=$(curl -s ${API_URL}/health || echo "")
-if echo "${HEALTH_CHECK_RESPONSE}" | grep -q '"status": "healthy"'; then
+if echo "${HEALTH_CHECK_RESPONSE}" | grep -q '"status": *"healthy"'; then
     print_success "API is healthy!"
     echo ""
     echo "Health check response:"
@@ -16,21 +16,37 @@ similarity + deal score.
 
 from __future__ import annotations
 
-import json
+import atexit
+import hmac
 import logging
 import os
+import re
 import threading
 import time
 from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
 
+import numpy as np
+import orjson
 import psycopg2
+import psycopg2.errors
+import psycopg2.extensions
 import psycopg2.pool
 from dotenv import load_dotenv
-from flask import Flask, jsonify, request
+from flask import Flask, Response, request
+from flask_compress import Compress
 from flask_cors import CORS
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, register_default_json
+from werkzeug.http import http_date
+
+try:
+    from numba import njit
+
+    _NUMBA_AVAILABLE = True
+except ImportError:  # numba is optional; scoring falls back to plain NumPy
+    _NUMBA_AVAILABLE = False
 
 # ---------------------------------------------------------------------------
 # Environment & logging
@@ -44,14 +60,63 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)
 
+# Comparables responses (up to 50 payloads with image URL lists) shrink several
+# times over; brotli/gzip level 4 keeps the CPU cost per response small.
+app.config.update(COMPRESS_MIMETYPES=["application/json"], COMPRESS_LEVEL=4, COMPRESS_BR_LEVEL=4)
+Compress(app)
+
+
+def _json_default(value: Any) -> Any:
+    # Keep Flask's wire format for datetimes (RFC 822, as jsonify emits)
+    if isinstance(value, datetime):
+        return http_date(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dump_json(obj: Any) -> bytes:
+    """Serialise ``obj`` with orjson (numpy values included)."""
+    return orjson.dumps(obj, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME)
+
+
+def json_response(body: bytes) -> Response:
+    """Wrap already-serialised JSON bytes in a response."""
+    return app.response_class(body, mimetype="application/json")
+
+
+def fast_jsonify(obj: Any) -> Response:
+    """jsonify() replacement that serialises with orjson."""
+    return json_response(dump_json(obj))
+
+
 # ---------------------------------------------------------------------------
 # Database helpers
 # ---------------------------------------------------------------------------
 
+# images is a JSON column, which psycopg2 decodes as it reads each row; use
+# orjson for that instead of the stdlib json module.
+register_default_json(globally=True, loads=orjson.loads)
+
+
+class PreparingConnection(psycopg2.extensions.connection):
+    """Connection that remembers which named statements it has PREPAREd."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.prepared: Set[str] = set()
+
+
+DB_MIN_CONN = int(os.getenv("DB_MIN_CONN", "2"))
+DB_MAX_CONN = int(os.getenv("DB_MAX_CONN", "10"))
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))
+# Server-side cap for every statement on pooled connections, so a bad plan
+# fails fast instead of holding one of the DB_MAX_CONN slots indefinitely.
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "2000"))
+
 _connection_pool: Optional[psycopg2.pool.ThreadedConnectionPool] = None
 _pool_lock = threading.Lock()
 
 
+@lru_cache(maxsize=1)
 def _db_config() -> Dict[str, Any]:
     """Collect required database settings and fail fast if any are missing."""
     required = {
@@ -69,96 +134,351 @@ def _db_config() -> Dict[str, Any]:
 
 
 def get_connection_pool() -> psycopg2.pool.ThreadedConnectionPool:
-    """Lazy-create a global threaded connection pool."""
+    """Lazy-create a global threaded connection pool.
+
+    The fast path reads the global once and takes no lock; creation is
+    serialised so concurrent first requests cannot build two pools.
+    """
     global _connection_pool
-    if _connection_pool and not _connection_pool.closed:
-        return _connection_pool
+    pool = _connection_pool
+    if pool is not None and not pool.closed:
+        return pool
 
     with _pool_lock:
         if _connection_pool and not _connection_pool.closed:
             return _connection_pool
 
         cfg = _db_config()
-        min_conn = int(os.getenv("DB_MIN_CONN", "2"))
-        max_conn = int(os.getenv("DB_MAX_CONN", "10"))
 
         logger.info(
             "Initialising database pool (host=%s, db=%s, min=%s, max=%s)",
             cfg["host"],
             cfg["dbname"],
-            min_conn,
-            max_conn,
+            DB_MIN_CONN,
+            DB_MAX_CONN,
         )
 
         _connection_pool = psycopg2.pool.ThreadedConnectionPool(
-            minconn=min_conn,
-            maxconn=max_conn,
-            connect_timeout=int(os.getenv("DB_CONNECT_TIMEOUT", "10")),
+            minconn=DB_MIN_CONN,
+            maxconn=DB_MAX_CONN,
+            connect_timeout=DB_CONNECT_TIMEOUT,
             keepalives=1,
             keepalives_idle=60,
             keepalives_interval=15,
             keepalives_count=5,
+            # JIT compilation only pays off for long analytical queries; these
+            # are all short index lookups
+            options=f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS} -c jit=off",
+            connection_factory=PreparingConnection,
             **cfg,
         )
         return _connection_pool
 
 
+def close_connection_pool() -> None:
+    """Close every pooled connection; registered to run at interpreter exit."""
+    with _pool_lock:
+        if _connection_pool is not None and not _connection_pool.closed:
+            _connection_pool.closeall()
+
+
+atexit.register(close_connection_pool)
+
+
 @contextmanager
-def get_db_cursor():
-    """Yield a cursor with automatic return to the pool."""
+def get_db_cursor(
+    cursor_factory: Any = RealDictCursor, statement_timeout_ms: Optional[int] = None, readonly: bool = True
+):
+    """Yield a cursor with automatic return to the pool.
+
+    Read-only blocks run in autocommit mode: psycopg2 would otherwise spend
+    a round trip on BEGIN before the first query and another on COMMIT.
+    ``statement_timeout_ms`` overrides DB_STATEMENT_TIMEOUT_MS for this
+    block only (0 disables the limit); SET LOCAL needs a transaction, so
+    that case runs in one, as do blocks with ``readonly=False``.
+    """
     pool = get_connection_pool()
     conn = pool.getconn()
+    transactional = not readonly or statement_timeout_ms is not None
     try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        conn.autocommit = not transactional
+        with conn.cursor(cursor_factory=cursor_factory) as cursor:
+            if statement_timeout_ms is not None:
+                cursor.execute("SET LOCAL statement_timeout = %s", (int(statement_timeout_ms),))
             yield cursor
-            conn.commit()
+            if transactional:
+                conn.commit()
     except Exception:
         conn.rollback()
+        _reset_prepared(conn)
         raise
     finally:
         pool.putconn(conn)
 
 
+def _reset_prepared(conn: Any) -> None:
+    """Forget prepared statements after a rollback (the same policy psycopg 3 uses)."""
+    prepared = getattr(conn, "prepared", None)
+    if not prepared or conn.closed:
+        return
+    prepared.clear()
+    with conn.cursor() as cursor:
+        cursor.execute("DEALLOCATE ALL")
+    conn.commit()
+
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SQL_DEBUG = os.getenv("CARMA_SQL_DEBUG") == "1"
+
+
+def timed_execute(cursor: Any, query: str, params: Optional[Sequence[Any]] = None) -> None:
+    """cursor.execute() that logs statements slower than SLOW_QUERY_MS.
+
+    With CARMA_SQL_DEBUG=1 the slow statement is re-run under EXPLAIN
+    (ANALYZE, BUFFERS) on a side cursor and its plan logged as well.
+    """
+    start = time.perf_counter()
+    cursor.execute(query, params)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if elapsed_ms <= SLOW_QUERY_MS:
+        return
+
+    statement = cursor.query.decode("utf-8", errors="replace")
+    logger.warning("Slow query (%.0f ms): %s", elapsed_ms, statement[:500])
+    if SQL_DEBUG:
+        try:
+            with cursor.connection.cursor() as explain_cursor:
+                explain_cursor.execute("EXPLAIN (ANALYZE, BUFFERS) " + statement)
+                plan = "\n".join(row[0] for row in explain_cursor.fetchall())
+            logger.warning("Plan for slow query:\n%s", plan)
+        except psycopg2.Error as exc:
+            logger.warning("EXPLAIN of slow query failed: %s", exc)
+
+
+def execute_prepared(cursor: Any, name: str, statement: str, params: Sequence[Any]) -> None:
+    """EXECUTE ``statement`` (written with $n placeholders), PREPAREing it on first use per connection."""
+    conn = cursor.connection
+    if name not in conn.prepared:
+        cursor.execute(f"PREPARE {name} AS {statement}")
+        conn.prepared.add(name)
+    placeholders = ", ".join(["%s"] * len(params))
+    timed_execute(cursor, f"EXECUTE {name} ({placeholders})", tuple(params))
+
+
+def fetch_dicts(cursor: Any) -> List[Dict[str, Any]]:
+    """fetchall() from a plain tuple cursor as dicts.
+
+    psycopg2 builds tuple rows in C; RealDictCursor fills every row column by
+    column in Python, which costs ~3x more on wide multi-row results.
+    """
+    names = [column.name for column in cursor.description]
+    return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+# ---------------------------------------------------------------------------
+# Response caching
+# ---------------------------------------------------------------------------
+
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+RESPONSE_CACHE_MAXSIZE = int(os.getenv("RESPONSE_CACHE_MAXSIZE", "10000"))
+# A comparables body (up to 50 payloads with descriptions and image lists)
+# is far larger than a vehicle row, so far fewer of them are kept.
+COMPARABLES_CACHE_MAXSIZE = int(os.getenv("COMPARABLES_CACHE_MAXSIZE", "500"))
+
+
+class TTLCache:
+    """Small thread-safe in-process cache whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, ttl: float, maxsize: int) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: Dict[Any, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at >= self.ttl:
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key: Any, value: Any) -> None:
+        now = time.monotonic()
+        with self._lock:
+            # Re-inserting moves the key to the end, so the dict stays ordered
+            # by store time and expired entries are always at the front
+            self._entries.pop(key, None)
+            while self._entries:
+                oldest = next(iter(self._entries))
+                if now - self._entries[oldest][0] < self.ttl:
+                    break
+                del self._entries[oldest]
+            if len(self._entries) >= self.maxsize:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (now, value)
+
+
+# Unknown / unavailable ids are remembered briefly so repeated 404s skip the
+# database, without hiding a listing that shows up again for long.
+MISSING_VEHICLE_TTL = float(os.getenv("MISSING_VEHICLE_TTL_SECONDS", "30"))
+
+vehicle_cache = TTLCache(RESPONSE_CACHE_TTL, RESPONSE_CACHE_MAXSIZE)
+# Holds serialised response bodies, so hits skip orjson.dumps as well
+comparables_cache = TTLCache(RESPONSE_CACHE_TTL, COMPARABLES_CACHE_MAXSIZE)
+missing_vehicle_cache = TTLCache(MISSING_VEHICLE_TTL, RESPONSE_CACHE_MAXSIZE)
+
+
+# ---------------------------------------------------------------------------
+# Stats materialized view
+# ---------------------------------------------------------------------------
+
+STATS_REFRESH_SECONDS = float(os.getenv("STATS_REFRESH_SECONDS", "60"))
+STATS_REFRESH_TIMEOUT_MS = int(os.getenv("STATS_REFRESH_TIMEOUT_MS", "30000"))
+# Same key as VehicleDatabase.STATS_REFRESH_LOCK_ID in the scraper, which
+# refreshes the view after each run.
+STATS_REFRESH_LOCK_ID = 0x43524D53
+
+stats_cache = TTLCache(STATS_REFRESH_SECONDS, 1)
+_stats_refresh_running = threading.Lock()
+
+
+def refresh_stats_view() -> None:
+    """Recompute vehicle_stats if it is older than STATS_REFRESH_SECONDS.
+
+    Every worker of every replica may call this; the advisory lock lets one
+    session refresh at a time and the others skip, and the freshness check
+    under the lock stops the next caller from repeating a refresh that just
+    finished. CONCURRENTLY keeps the previous snapshot readable meanwhile.
+    """
+    try:
+        with get_db_cursor(statement_timeout_ms=STATS_REFRESH_TIMEOUT_MS, readonly=False) as cursor:
+            cursor.execute("SELECT pg_try_advisory_xact_lock(%s) AS locked", (STATS_REFRESH_LOCK_ID,))
+            if not cursor.fetchone()["locked"]:
+                return
+            cursor.execute(
+                """
+                SELECT refreshed_at > NOW() - make_interval(secs => %s) AS fresh
+                FROM vehicle_marketplace.vehicle_stats
+                """,
+                (STATS_REFRESH_SECONDS,),
+            )
+            row = cursor.fetchone()
+            if row is not None and row["fresh"]:
+                return
+            cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY vehicle_marketplace.vehicle_stats")
+    except psycopg2.Error as exc:
+        logger.warning("Stats view refresh failed: %s", exc)
+
+
+def _refresh_stats_in_background() -> None:
+    try:
+        refresh_stats_view()
+    finally:
+        _stats_refresh_running.release()
+
+
+def schedule_stats_refresh() -> None:
+    """Refresh the stats view on a daemon thread, unless this process already is."""
+    if not _stats_refresh_running.acquire(blocking=False):
+        return
+    thread = threading.Thread(target=_refresh_stats_in_background, daemon=True)
+    thread.start()
+
+
+def fetch_stats() -> Dict[str, Any]:
+    """Read the stats row from the materialized view, or scan the table if it does not exist yet.
+
+    A view older than STATS_REFRESH_SECONDS is still served, and a refresh
+    is scheduled in the background; nothing refreshes while /stats is idle.
+    """
+    cached = stats_cache.get("stats")
+    if cached is not None:
+        return cached
+
+    try:
+        with get_db_cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT total_vehicles, unique_makes, data_sources,
+                       refreshed_at <= NOW() - make_interval(secs => %s) AS stale
+                FROM vehicle_marketplace.vehicle_stats
+                """,
+                (STATS_REFRESH_SECONDS,),
+            )
+            row = cursor.fetchone()
+    except psycopg2.errors.UndefinedTable:
+        logger.warning("vehicle_stats view missing – falling back to a full table scan")
+        row = None
+
+    if row is not None and row["stale"]:
+        schedule_stats_refresh()
+
+    if row is None:
+        with get_db_cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT
+                    COUNT(*) FILTER (WHERE is_vehicle_available) AS total_vehicles,
+                    COUNT(DISTINCT make) AS unique_makes,
+                    COUNT(DISTINCT data_source) AS data_sources
+                FROM vehicle_marketplace.vehicle_data
+                """
+            )
+            row = cursor.fetchone()
+
+    stats_row = {key: row[key] for key in ("total_vehicles", "unique_makes", "data_sources")}
+    stats_cache.set("stats", stats_row)
+    return stats_row
+
+
 # ---------------------------------------------------------------------------
 # Normalisation helpers
 # ---------------------------------------------------------------------------
 
-NUMERIC_PRICE_SQL = "CAST(NULLIF(REGEXP_REPLACE(price, '[^0-9]', '', 'g'), '') AS DOUBLE PRECISION)"
-NUMERIC_MILEAGE_SQL = (
-    "CAST(NULLIF(REGEXP_REPLACE(COALESCE(CAST(mileage_km AS TEXT), ''), '[^0-9]', '', 'g'), '') AS DOUBLE PRECISION)"
-)
+# ASCII digits only, matching the '[^0-9]' and '[0-9]{4}' patterns used by the
+# SQL generated columns, so the fallbacks below agree with price_num /
+# mileage_num / registration_year on every input
+_NON_DIGIT_RE = re.compile(r"[^0-9]+")
+_YEAR_RE = re.compile(r"[0-9]{4}")
 
 
-def normalise_price(value: Any) -> Optional[float]:
+def _digits_to_float(value: Any) -> Optional[float]:
     if value is None:
         return None
     if isinstance(value, (int, float)):
         return float(value)
-    digits = "".join(ch for ch in str(value) if ch.isdigit())
+    digits = _NON_DIGIT_RE.sub("", str(value))
     if not digits:
         return None
     return float(digits)
 
 
+def normalise_price(value: Any) -> Optional[float]:
+    return _digits_to_float(value)
+
+
 def normalise_mileage(value: Any) -> Optional[float]:
-    if value is None:
-        return None
-    if isinstance(value, (int, float)):
-        return float(value)
-    digits = "".join(ch for ch in str(value) if ch.isdigit())
-    if not digits:
-        return None
-    return float(digits)
+    return _digits_to_float(value)
 
 
 def extract_year(raw: Any) -> Optional[int]:
     if raw is None:
         return None
-    text = str(raw)
-    for token in text.replace("/", "-").split("-"):
-        if token.isdigit() and len(token) == 4:
-            return int(token)
-    return None
+    match = _YEAR_RE.search(str(raw))
+    return int(match.group(0)) if match else None
+
+
+def parse_power(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
 
 
 def safe_lower(text: Optional[str]) -> Optional[str]:
@@ -170,13 +490,13 @@ def parse_images(raw: Any) -> List[str]:
         return []
     if isinstance(raw, list):
         return [str(item) for item in raw if item]
-    if isinstance(raw, str):
+    if isinstance(raw, (str, bytes, bytearray, memoryview)):
         try:
-            decoded = json.loads(raw)
-            if isinstance(decoded, list):
-                return [str(item) for item in decoded if item]
-        except json.JSONDecodeError:
+            decoded = orjson.loads(raw)
+        except orjson.JSONDecodeError:
             return []
+        if isinstance(decoded, list):
+            return [str(item) for item in decoded if item]
     return []
 
 
@@ -189,7 +509,7 @@ def format_vehicle_payload(row: Dict[str, Any]) -> Dict[str, Any]:
     if mileage is None:
         mileage = normalise_mileage(row.get("mileage_km"))
 
-    year = extract_year(row.get("first_registration_raw"))
+    year = row.get("registration_year") or extract_year(row.get("first_registration_raw"))
 
     return {
         "id": row.get("id") or row.get("vehicle_id"),
@@ -209,7 +529,7 @@ def format_vehicle_payload(row: Dict[str, Any]) -> Dict[str, Any]:
         "upholstery_color": row.get("upholstery_color"),
         "description": row.get("description") or "",
         "data_source": row.get("data_source"),
-        "power_kw": float(row["power_kw"]) if row.get("power_kw") is not None else None,
+        "power_kw": parse_power(row.get("power_kw")),
         "images": parse_images(row.get("images")),
         "first_registration_raw": row.get("first_registration_raw"),
         "created_at": row.get("created_at"),
@@ -223,6 +543,49 @@ def format_vehicle_payload(row: Dict[str, Any]) -> Dict[str, Any]:
 SimilarityWeights = Dict[str, float]
 
 
+def _numeric_components_kernel(
+    year: np.ndarray,
+    mileage: np.ndarray,
+    power: np.ndarray,
+    price: np.ndarray,
+    target_year: float,
+    target_mileage: float,
+    target_power: float,
+    target_price: float,
+) -> np.ndarray:
+    """Single-pass age/mileage/power/price components; NaN marks a missing value.
+
+    Mirrors SimilarityEngine._similarity_ratio / _price_deal element-wise.
+    """
+    count = year.shape[0]
+    out = np.empty((count, 4))
+    targets = (target_year, target_mileage, target_power)
+    tolerances = (0.10, 1.0, 0.25)
+    for i in range(count):
+        values = (year[i], mileage[i], power[i])
+        for j in range(3):
+            a = targets[j]
+            b = values[j]
+            # "not (x > 0)" also catches NaN
+            if not (a > 0) or not (b > 0):
+                out[i, j] = 0.5
+            else:
+                out[i, j] = max(0.0, 1.0 - abs(a - b) / (a * tolerances[j]))
+        if not (target_price > 0) or np.isnan(price[i]):
+            out[i, 3] = 0.5
+        else:
+            delta_pct = min(0.4, max(-0.4, (target_price - price[i]) / target_price))
+            out[i, 3] = 0.5 + (delta_pct / 0.8)
+    return out
+
+
+if _NUMBA_AVAILABLE:
+    # No fastmath: the kernel relies on NaN comparisons for missing values.
+    _numeric_components_kernel = njit(cache=True)(_numeric_components_kernel)
+    # Pay the JIT compile at import rather than on the first request
+    _numeric_components_kernel(np.zeros(1), np.zeros(1), np.zeros(1), np.zeros(1), 0.0, 0.0, 0.0, 0.0)
+
+
 class SimilarityEngine:
     """Very small heuristic similarity scorer for vehicle listings."""
 
@@ -235,6 +598,9 @@ class SimilarityEngine:
             "power": 0.10,
             "price": 0.30,
         }
+        # Frozen component order and weight vector for score_batch
+        self._keys: Tuple[str, ...] = tuple(self.weights)
+        self._weight_vec = np.fromiter((self.weights[key] for key in self._keys), dtype=np.float64, count=len(self._keys))
 
     @staticmethod
     def _match_score(a: Optional[str], b: Optional[str]) -> float:
@@ -278,6 +644,76 @@ class SimilarityEngine:
 
         return final_score, components
 
+    @staticmethod
+    def _match_score_batch(a: Optional[str], b: List[Optional[str]]) -> np.ndarray:
+        if not a:
+            return np.full(len(b), 0.5)
+        target = safe_lower(a)
+        return np.array([0.5 if not value else float(safe_lower(value) == target) for value in b])
+
+    @staticmethod
+    def _similarity_ratio_batch(a: Optional[float], b: np.ndarray, tolerance: float) -> np.ndarray:
+        if a is None or a <= 0:
+            return np.full(b.shape, 0.5)
+        with np.errstate(invalid="ignore"):
+            valid = b > 0
+        ratio = np.maximum(0.0, 1.0 - np.abs(a - b) / (a * tolerance))
+        return np.where(valid, ratio, 0.5)
+
+    @staticmethod
+    def _price_deal_batch(target_price: Optional[float], candidate_price: np.ndarray) -> np.ndarray:
+        if target_price is None or target_price <= 0:
+            return np.full(candidate_price.shape, 0.5)
+        delta_pct = np.clip((target_price - candidate_price) / target_price, -0.4, 0.4)
+        return np.where(np.isnan(candidate_price), 0.5, 0.5 + (delta_pct / 0.8))
+
+    def score_batch(
+        self, target: Dict[str, Any], candidates: Dict[str, Any]
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Vectorised :meth:`score` over column-oriented candidates.
+
+        ``candidates`` maps payload keys to per-candidate columns: sequences for
+        ``color``/``interior_color`` and float64 arrays (NaN = missing) for
+        ``year``/``mileage_km``/``power_kw``/``price_eur``.
+        """
+        target_year = float(target["year"]) if target.get("year") else None
+        components = {
+            "color": self._match_score_batch(target.get("color"), candidates["color"]),
+            "interior_color": self._match_score_batch(target.get("interior_color"), candidates["interior_color"]),
+        }
+        if _NUMBA_AVAILABLE:
+            numeric = _numeric_components_kernel(
+                candidates["year"],
+                candidates["mileage_km"],
+                candidates["power_kw"],
+                candidates["price_eur"],
+                *(
+                    np.nan if value is None else float(value)
+                    for value in (target_year, target.get("mileage_km"), target.get("power_kw"), target.get("price_eur"))
+                ),
+            )
+            components.update(
+                {"age": numeric[:, 0], "mileage": numeric[:, 1], "power": numeric[:, 2], "price": numeric[:, 3]}
+            )
+        else:
+            components.update(
+                {
+                    "age": self._similarity_ratio_batch(target_year, candidates["year"], tolerance=0.10),
+                    "mileage": self._similarity_ratio_batch(
+                        target.get("mileage_km"), candidates["mileage_km"], tolerance=1.0
+                    ),
+                    "power": self._similarity_ratio_batch(target.get("power_kw"), candidates["power_kw"], tolerance=0.25),
+                    "price": self._price_deal_batch(target.get("price_eur"), candidates["price_eur"]),
+                }
+            )
+
+        count = len(candidates["price_eur"])
+        component_matrix = np.empty((count, len(self._keys)))
+        for column, key in enumerate(self._keys):
+            component_matrix[:, column] = components.get(key, 0.5)
+
+        return component_matrix @ self._weight_vec, components
+
 
 similarity_engine = SimilarityEngine()
 
@@ -286,193 +722,256 @@ similarity_engine = SimilarityEngine()
 # Query helpers
 # ---------------------------------------------------------------------------
 
-SELECT_BASE_FIELDS = f"""
-    vehicle_id,
-    listing_url,
-    price,
-    mileage_km,
-    first_registration_raw,
-    make,
-    model,
-    fuel_type,
-    transmission,
-    body_type,
-    description,
-    data_source,
-    power_kw,
-    images,
-    color,
-    interior_color,
-    upholstery_color,
-    created_at,
-    {NUMERIC_PRICE_SQL} AS price_num,
-    {NUMERIC_MILEAGE_SQL} AS mileage_num
-"""
+# price_num / mileage_num / registration_year are stored generated columns on
+# vehicle_data (see VehicleDatabase.create_derived_columns in the scraper).
+FULL_COLUMNS: Tuple[str, ...] = (
+    "vehicle_id",
+    "listing_url",
+    "price",
+    "mileage_km",
+    "first_registration_raw",
+    "make",
+    "model",
+    "fuel_type",
+    "transmission",
+    "body_type",
+    "description",
+    "data_source",
+    "power_kw",
+    "images",
+    "color",
+    "interior_color",
+    "upholstery_color",
+    "created_at",
+    "price_num",
+    "mileage_num",
+    "registration_year",
+)
+SELECT_FULL_FIELDS = ", ".join(FULL_COLUMNS)
+
+# Candidates only need the scoring inputs; the winners are re-read with
+# SELECT_FULL_FIELDS by primary key once ranking is done.
+SCORING_COLUMNS: Tuple[str, ...] = (
+    "unique_id",
+    "price_num",
+    "mileage_num",
+    "registration_year",
+    "power_kw",
+    "color",
+    "interior_color",
+)
 
 
-def fetch_vehicle(vehicle_id: str) -> Optional[Dict[str, Any]]:
-    """Return a single vehicle row, or None if not found."""
-    with get_db_cursor() as cursor:
-        cursor.execute(
-            f"""
-            SELECT {SELECT_BASE_FIELDS}
-            FROM vehicle_marketplace.vehicle_data
-            WHERE vehicle_id = %s
-              AND is_vehicle_available = true
-            LIMIT 1
-            """,
-            (vehicle_id,),
-        )
-        row = cursor.fetchone()
-    return row
+LISTING_STATEMENT = (
+    "carma_listing",
+    f"""
+    SELECT {SELECT_FULL_FIELDS}
+    FROM vehicle_marketplace.vehicle_data
+    WHERE vehicle_id = $1
+      AND is_vehicle_available = true
+    LIMIT 1
+    """,
+)
 
 
-def build_attempts(target_row: Dict[str, Any]) -> List[Dict[str, bool]]:
-    """Define progressive query relaxations."""
-    has_color = bool(target_row.get("color"))
-    has_body = bool(target_row.get("body_type"))
-    has_transmission = bool(target_row.get("transmission"))
-    has_fuel = bool(target_row.get("fuel_type"))
-
-    attempts = [
-        {"name": "strict", "color": has_color, "body": has_body, "transmission": has_transmission, "fuel": has_fuel},
-        {"name": "relaxed_color", "color": False, "body": has_body, "transmission": has_transmission, "fuel": has_fuel},
-        {"name": "relaxed_color_body", "color": False, "body": False, "transmission": has_transmission, "fuel": has_fuel},
-        {"name": "relaxed_drivetrain", "color": False, "body": False, "transmission": False, "fuel": has_fuel},
-        {"name": "make_model_only", "color": False, "body": False, "transmission": False, "fuel": False},
-    ]
-    # Deduplicate attempts in case some attributes are already missing
-    seen = set()
-    result = []
-    for attempt in attempts:
-        signature = tuple(sorted(attempt.items()))
-        if signature not in seen:
-            seen.add(signature)
-            result.append(attempt)
-    return result
-
-
-def find_candidate_rows(target_row: Dict[str, Any], target_year: Optional[int]) -> List[Dict[str, Any]]:
-    """Fetch candidate rows using progressive relaxation."""
-    attempts = build_attempts(target_row)
-    price_range = None
-    mileage_max = None
-
-    target_price = normalise_price(target_row.get("price_num") or target_row.get("price"))
-    if target_price and target_price > 0:
-        price_range = (target_price * 0.6, target_price * 1.4)
-
-    target_mileage = normalise_mileage(target_row.get("mileage_num") or target_row.get("mileage_km"))
-    if target_mileage and target_mileage > 0:
-        mileage_max = target_mileage * 2.0
-
-    for attempt in attempts:
-        base_conditions = [
-            "is_vehicle_available = true",
-            "vehicle_id != %s",
-            "make = %s",
-            "model = %s",
-        ]
-        params: List[Any] = [
-            target_row["vehicle_id"],
-            target_row["make"],
-            target_row["model"],
-        ]
-
-        if attempt["fuel"] and target_row.get("fuel_type"):
-            base_conditions.append("fuel_type = %s")
-            params.append(target_row["fuel_type"])
-
-        if attempt["transmission"] and target_row.get("transmission"):
-            base_conditions.append("transmission = %s")
-            params.append(target_row["transmission"])
-
-        if attempt["body"] and target_row.get("body_type"):
-            base_conditions.append("body_type = %s")
-            params.append(target_row["body_type"])
-
-        if attempt["color"] and target_row.get("color"):
-            base_conditions.append("color = %s")
-            params.append(target_row["color"])
-
-        if target_year:
-            base_conditions.append(
-                "CAST(SUBSTRING(CAST(first_registration_raw AS TEXT), 1, 4) AS INTEGER) BETWEEN %s AND %s"
-            )
-            params.extend([target_year - 2, target_year + 2])
+def fetch_vehicle(vehicle_id: str, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+    """Return a single vehicle row, or None if not found.
 
-        where_clause = " AND ".join(base_conditions)
-        logger.info(
-            "Attempt %s – where(%s params) price_range=%s mileage_max=%s",
-            attempt["name"],
-            len(base_conditions),
-            price_range,
-            mileage_max,
-        )
+    ``use_cache=False`` skips the lookup but still stores the fresh result.
+    """
+    if use_cache:
+        cached = vehicle_cache.get(vehicle_id)
+        if cached is not None:
+            return cached
+        if missing_vehicle_cache.get(vehicle_id):
+            return None
 
-        with get_db_cursor() as cursor:
-            query_start = time.time()
-            cursor.execute(
-                f"""
-                SELECT {SELECT_BASE_FIELDS}
-                FROM vehicle_marketplace.vehicle_data
-                WHERE {where_clause}
-                ORDER BY created_at DESC
-                LIMIT %s
-                """,
-                (*params, int(os.getenv("CANDIDATE_LIMIT", "400"))),
-            )
-            rows = cursor.fetchall()
-            logger.info(
-                "Attempt %s – fetched %s rows in %.3fs",
-                attempt["name"],
-                len(rows),
-                time.time() - query_start,
-            )
+    name, statement = LISTING_STATEMENT
+    with get_db_cursor() as cursor:
+        execute_prepared(cursor, name, statement, (vehicle_id,))
+        row = cursor.fetchone()
 
-        if not rows:
-            continue
+    if row is not None:
+        vehicle_cache.set(vehicle_id, row)
+    else:
+        missing_vehicle_cache.set(vehicle_id, True)
+    return row
 
-        filtered = []
-        dropped = 0
-        for row in rows:
-            row_price = normalise_price(row.get("price_num") or row.get("price"))
-            row_mileage = normalise_mileage(row.get("mileage_num") or row.get("mileage_km"))
 
-            if price_range and (row_price is None or not price_range[0] <= row_price <= price_range[1]):
-                dropped += 1
-                continue
-            if mileage_max and row_mileage and row_mileage > mileage_max:
-                dropped += 1
-                continue
+# Relaxation order of the old per-attempt queries (strict -> relaxed_color ->
+# relaxed_color_body -> relaxed_drivetrain -> make_model_only): a candidate's
+# tier is how many of these attributes match the target, counted from the
+# front. An attribute the target lacks was never filtered on, so it matches.
+MATCH_TIER_COLUMNS: Tuple[str, ...] = ("fuel_type", "transmission", "body_type", "color")
 
-            filtered.append(row)
 
-        logger.info(
-            "Attempt %s – keeping %s rows (dropped %s on range checks)",
-            attempt["name"],
-            len(filtered),
-            dropped,
+HYDRATE_STATEMENT = (
+    "carma_hydrate",
+    f"""
+    SELECT unique_id, {SELECT_FULL_FIELDS}
+    FROM vehicle_marketplace.vehicle_data
+    WHERE unique_id = ANY($1)
+      AND is_vehicle_available = true
+    """,
+)
+
+
+def fetch_vehicles_by_unique_id(unique_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Return full rows for the given primary keys, keyed by ``unique_id``."""
+    if not unique_ids:
+        return {}
+    name, statement = HYDRATE_STATEMENT
+    with get_db_cursor(cursor_factory=None) as cursor:
+        execute_prepared(cursor, name, statement, (list(unique_ids),))
+        rows = fetch_dicts(cursor)
+    return {row["unique_id"]: row for row in rows}
+
+
+def _comparables_statement() -> str:
+    """Build the prepared query that returns the target and its candidates together.
+
+    Every row is ``kind`` followed by SCORING_COLUMNS and then the remaining
+    FULL_COLUMNS; the target row (kind 't') fills them all, candidate rows
+    (kind 'c') leave the extra columns NULL. The price / mileage / year
+    windows mirror the Python parsers because they read the same generated
+    columns the target payload is built from; each is one range over an
+    expression of the candidate-windows index (NULL maps to a sentinel
+    outside every real window, a missing target value to an unbounded
+    range) so it can serve as an index condition. Only rows of the highest
+    MATCH_TIER_COLUMNS tier present are returned, as the first successful
+    relaxation attempt used to; when more match than the limit allows, the
+    closest by price, then mileage are kept. Parameters: $1 vehicle_id,
+    $2 candidate limit.
+    """
+    extra_columns = [column for column in FULL_COLUMNS if column not in SCORING_COLUMNS]
+    matches = [f"(NULLIF(tgt.{column}, '') IS NULL OR v.{column} = tgt.{column})" for column in MATCH_TIER_COLUMNS]
+    tier_sql = " ".join(
+        f"WHEN {' AND '.join(matches[:tier])} THEN {tier}" for tier in range(len(matches), 0, -1)
+    )
+    return f"""
+        WITH tgt AS (
+            SELECT {", ".join(SCORING_COLUMNS + tuple(extra_columns))}
+            FROM vehicle_marketplace.vehicle_data
+            WHERE vehicle_id = $1
+              AND is_vehicle_available = true
+            LIMIT 1
+        ),
+        cand AS (
+            SELECT {", ".join(f"v.{column}" for column in SCORING_COLUMNS)},
+                   CASE {tier_sql} ELSE 0 END AS tier
+            FROM vehicle_marketplace.vehicle_data v
+            JOIN tgt ON v.make = tgt.make AND v.model = tgt.model
+            WHERE v.is_vehicle_available = true
+              AND v.vehicle_id != tgt.vehicle_id
+              AND COALESCE(v.price_num, -1)
+                  BETWEEN CASE WHEN tgt.price_num > 0 THEN tgt.price_num * 0.6 ELSE '-Infinity' END
+                      AND CASE WHEN tgt.price_num > 0 THEN tgt.price_num * 1.4 ELSE 'Infinity' END
+              AND COALESCE(v.registration_year, -1)
+                  BETWEEN CASE WHEN tgt.registration_year <> 0 THEN GREATEST(tgt.registration_year - 2, 0) ELSE -32768 END
+                      AND CASE WHEN tgt.registration_year <> 0 THEN tgt.registration_year + 2 ELSE 32767 END
+              AND COALESCE(v.mileage_num, 0)
+                  <= CASE WHEN tgt.mileage_num > 0 THEN tgt.mileage_num * 2 ELSE 'Infinity' END
+            ORDER BY tier DESC,
+                     ABS(v.price_num - tgt.price_num) ASC NULLS LAST,
+                     ABS(v.mileage_num - tgt.mileage_num) ASC NULLS LAST,
+                     v.created_at DESC
+            LIMIT $2
         )
+        SELECT 't' AS kind, * FROM tgt
+        UNION ALL
+        SELECT 'c', {", ".join(SCORING_COLUMNS)}{", NULL" * len(extra_columns)}
+        FROM cand
+        WHERE tier = (SELECT MAX(tier) FROM cand)
+    """
+
+
+COMPARABLES_STATEMENT = ("carma_comparables", _comparables_statement())
+CANDIDATE_LIMIT = int(os.getenv("CANDIDATE_LIMIT", "400"))
+
+
+def fetch_target_and_candidates(vehicle_id: str) -> Tuple[Optional[Dict[str, Any]], List[Tuple[Any, ...]]]:
+    """Fetch the target row and its candidate rows (``SCORING_COLUMNS`` tuples) in one round trip.
+
+    Candidates come back closest matches first; the target is None when the
+    vehicle does not exist or is no longer available.
+    """
+    name, statement = COMPARABLES_STATEMENT
+    with get_db_cursor(cursor_factory=None) as cursor:
+        query_start = time.time()
+        execute_prepared(cursor, name, statement, (vehicle_id, CANDIDATE_LIMIT))
+        rows = cursor.fetchall()
+        column_names = [column.name for column in cursor.description]
+
+    target_row = None
+    candidates = []
+    scoring_end = 1 + len(SCORING_COLUMNS)
+    for row in rows:
+        if row[0] == "t":
+            target_row = dict(zip(column_names[1:], row[1:]))
+        else:
+            candidates.append(row[1:scoring_end])
+
+    logger.info(
+        "Comparables query for %s – fetched %s candidates in %.3fs",
+        vehicle_id,
+        len(candidates),
+        time.time() - query_start,
+    )
+    return target_row, candidates
+
+
+def top_k_indices(scores: np.ndarray, top: int) -> np.ndarray:
+    """Indices of the ``top`` highest scores, best first; ties keep input order.
+
+    A full stable sort rather than argpartition: with ties across the cut,
+    argpartition keeps arbitrary members of the tie, and at CANDIDATE_LIMIT
+    rows the sort costs microseconds.
+    """
+    return np.argsort(-scores, kind="stable")[:top]
+
+
+def candidate_columns(rows: List[Tuple[Any, ...]]) -> Dict[str, Any]:
+    """Transpose ``SCORING_COLUMNS`` rows into the column layout score_batch expects."""
+    unique_ids, prices, mileages, years, powers, colors, interior_colors = (
+        zip(*rows) if rows else ((),) * len(SCORING_COLUMNS)
+    )
+    return {
+        "unique_id": unique_ids,
+        "price_eur": np.array(prices, dtype=np.float64),
+        "mileage_km": np.array(mileages, dtype=np.float64),
+        "year": np.array(years, dtype=np.float64),
+        "power_kw": np.array([parse_power(value) for value in powers], dtype=np.float64),
+        "color": colors,
+        "interior_color": interior_colors,
+    }
 
-        if filtered:
-            return filtered
 
-    return []
+def score_candidates(
+    target_payload: Dict[str, Any], candidates: List[Tuple[Any, ...]], top: int
+) -> List[Dict[str, Any]]:
+    """Compute similarity + deal scores and return the best ``top`` payloads."""
+    if not candidates:
+        return []
 
+    columns = candidate_columns(candidates)
+    scores, components = similarity_engine.score_batch(target_payload, columns)
 
-def score_candidates(target_payload: Dict[str, Any], candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Compute similarity + deal scores and return sorted payloads."""
-    scored: List[Tuple[float, Dict[str, Any], Dict[str, float]]] = []
-    for row in candidates:
-        payload = format_vehicle_payload(
-            {**row, "vehicle_id": row.get("id") or row.get("vehicle_id")}
-        )
-        score, components = similarity_engine.score(target_payload, payload)
+    order = top_k_indices(scores, top)
+    full_rows = fetch_vehicles_by_unique_id([columns["unique_id"][index] for index in order])
+
+    target_price = target_payload.get("price_eur")
+    ranked: List[Dict[str, Any]] = []
+    for index in order:
+        row = full_rows.get(columns["unique_id"][index])
+        if row is None:
+            # Went unavailable between the candidate query and hydration
+            continue
+        payload = format_vehicle_payload(row)
+        score = float(scores[index])
+        row_components = {key: float(values[index]) for key, values in components.items()}
         payload["score"] = score
         payload["final_score"] = score
 
-        target_price = target_payload.get("price_eur")
         candidate_price = payload.get("price_eur")
         savings = 0.0
         if target_price and candidate_price:
@@ -481,39 +980,55 @@ def score_candidates(target_payload: Dict[str, Any], candidates: List[Dict[str,
         payload.update(
             {
                 "price_hat": float(candidate_price * 1.05) if candidate_price else None,
-                "deal_score": components["price"],
+                "deal_score": row_components["price"],
                 "savings": savings,
                 "savings_percent": (savings / target_price * 100) if target_price and target_price > 0 else None,
                 "ranking_details": {
-                    "similarity_components": components,
+                    "similarity_components": row_components,
                     "weights": similarity_engine.weights,
                 },
             }
         )
-        scored.append((score, payload, components))
+        ranked.append(payload)
 
-    scored.sort(key=lambda entry: entry[0], reverse=True)
-    return [payload for score, payload, _ in scored]
+    return ranked
 
 
 # ---------------------------------------------------------------------------
 # Flask endpoints
 # ---------------------------------------------------------------------------
 
+# ?nocache=1 skips the response caches, but only for requests carrying an
+# X-Admin-Token header equal to CARMA_ADMIN_TOKEN; unset disables it.
+ADMIN_TOKEN = os.getenv("CARMA_ADMIN_TOKEN", "")
+
+
+def cache_bypass_requested() -> bool:
+    """True when an admin asked for ``?nocache=1``; anonymous clients always get cached responses."""
+    if request.args.get("nocache") != "1" or not ADMIN_TOKEN:
+        return False
+    supplied = request.headers.get("X-Admin-Token", "")
+    return hmac.compare_digest(supplied.encode(), ADMIN_TOKEN.encode())
+
+
+@app.errorhandler(psycopg2.errors.QueryCanceled)
+def query_timeout(exc: psycopg2.errors.QueryCanceled) -> Tuple[Any, int]:
+    logger.warning("Query cancelled by statement_timeout on %s: %s", request.path, exc)
+    return fast_jsonify({"error": "Database query timed out"}), 503
+
+
 @app.route("/health", methods=["GET"])
 def health() -> Tuple[Any, int]:
     try:
-        with get_db_cursor() as cursor:
-            cursor.execute(
-                "SELECT COUNT(*) AS vehicle_count FROM vehicle_marketplace.vehicle_data WHERE is_vehicle_available = true"
-            )
-            result = cursor.fetchone()
+        # Liveness only: probes hit this every few seconds, counts live on /stats.
+        # One autocommit round trip, bounded by the pool's statement_timeout.
+        with get_db_cursor(cursor_factory=None) as cursor:
+            cursor.execute("SELECT 1")
         return (
-            jsonify(
+            fast_jsonify(
                 {
                     "status": "healthy",
                     "database_connected": True,
-                    "vehicle_count": result["vehicle_count"] if result else 0,
                     "timestamp": datetime.utcnow().isoformat(),
                 }
             ),
@@ -522,7 +1037,7 @@ def health() -> Tuple[Any, int]:
     except Exception as exc:
         logger.exception("Health check failed: %s", exc)
         return (
-            jsonify({"status": "unhealthy", "database_connected": False, "error": str(exc)}),
+            fast_jsonify({"status": "unhealthy", "database_connected": False, "error": str(exc)}),
             503,
         )
 
@@ -530,19 +1045,9 @@ def health() -> Tuple[Any, int]:
 @app.route("/stats", methods=["GET"])
 def stats() -> Tuple[Any, int]:
     try:
-        with get_db_cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT
-                    COUNT(*) FILTER (WHERE is_vehicle_available) AS total_vehicles,
-                    COUNT(DISTINCT make) AS unique_makes,
-                    COUNT(DISTINCT data_source) AS data_sources
-                FROM vehicle_marketplace.vehicle_data
-                """
-            )
-            row = cursor.fetchone()
+        row = fetch_stats()
         return (
-            jsonify(
+            fast_jsonify(
                 {
                     "total_vehicles": row["total_vehicles"],
                     "unique_makes": row["unique_makes"],
@@ -552,18 +1057,20 @@ def stats() -> Tuple[Any, int]:
             ),
             200,
         )
+    except psycopg2.errors.QueryCanceled:
+        raise
     except Exception as exc:
         logger.exception("Stats endpoint failed: %s", exc)
-        return jsonify({"error": str(exc)}), 500
+        return fast_jsonify({"error": str(exc)}), 500
 
 
 @app.route("/listings/<vehicle_id>", methods=["GET"])
 def get_vehicle_endpoint(vehicle_id: str) -> Tuple[Any, int]:
-    row = fetch_vehicle(vehicle_id)
+    row = fetch_vehicle(vehicle_id, use_cache=not cache_bypass_requested())
     if not row:
-        return jsonify({"error": f"Vehicle {vehicle_id} not found"}), 404
+        return fast_jsonify({"error": f"Vehicle {vehicle_id} not found"}), 404
     payload = format_vehicle_payload({**row, "vehicle_id": vehicle_id})
-    return jsonify(payload), 200
+    return fast_jsonify(payload), 200
 
 
 @app.route("/listings/<vehicle_id>/comparables", methods=["GET"])
@@ -572,37 +1079,49 @@ def comparables_endpoint(vehicle_id: str) -> Tuple[Any, int]:
     try:
         top = max(1, min(int(top_param), 50))
     except ValueError:
-        return jsonify({"error": "Invalid 'top' parameter"}), 400
-
-    target_row = fetch_vehicle(vehicle_id)
+        return fast_jsonify({"error": "Invalid 'top' parameter"}), 400
+
+    use_cache = not cache_bypass_requested()
+    cache_key = (vehicle_id, top)
+    if use_cache:
+        cached = comparables_cache.get(cache_key)
+        if cached is not None:
+            return json_response(cached), 200
+        if missing_vehicle_cache.get(vehicle_id):
+            return fast_jsonify({"error": f"Vehicle {vehicle_id} not found"}), 404
+
+    target_row, candidates_raw = fetch_target_and_candidates(vehicle_id)
     if not target_row:
-        return jsonify({"error": f"Vehicle {vehicle_id} not found"}), 404
+        missing_vehicle_cache.set(vehicle_id, True)
+        return fast_jsonify({"error": f"Vehicle {vehicle_id} not found"}), 404
 
-    target_payload = format_vehicle_payload({**target_row, "vehicle_id": vehicle_id})
-    target_year = target_payload.get("year")
+    target_payload = format_vehicle_payload(target_row)
 
-    candidates_raw = find_candidate_rows(target_row, target_year)
     if not candidates_raw:
-        return jsonify({"error": "No comparable vehicles found"}), 404
+        return fast_jsonify({"error": "No comparable vehicles found"}), 404
 
-    scored = score_candidates(target_payload, candidates_raw)
+    scored = score_candidates(target_payload, candidates_raw, top)
     response = {
         "vehicle": target_payload,
-        "comparables": scored[:top],
+        "comparables": scored,
         "metadata": {
             "requested_top": top,
-            "returned": len(scored[:top]),
-            "total_candidates": len(scored),
+            "returned": len(scored),
+            "total_candidates": len(candidates_raw),
         },
     }
-    return jsonify(response), 200
+    body = dump_json(response)
+    comparables_cache.set(cache_key, body)
+    return json_response(body), 200
 
 
 # ---------------------------------------------------------------------------
 # Entry point
 # ---------------------------------------------------------------------------
 
+# Local development only: production serves ``app`` through gunicorn's
+# gthread workers (see Dockerfile.flask), not Flask's built-in server.
 if __name__ == "__main__":
     port = int(os.getenv("PORT", "8000"))
-    logger.info("Starting CARMA API on port %s", port)
+    logger.warning("Starting CARMA API on Flask's development server (port %s); use gunicorn in production", port)
     app.run(host="0.0.0.0", port=port, debug=False)
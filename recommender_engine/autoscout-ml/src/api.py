@@ -228,6 +228,8 @@ STOPWORDS = {
 }
 
 TOKEN_SPLIT = re.compile(r"[^\w]+", re.UNICODE)
+WHITESPACE_RUN = re.compile(r"\s+")
+COLOR_PART_SPLIT = re.compile(r"[\/,;]| und | with ")
 
 CANDIDATE_CACHE: Dict[Tuple[str, str, int], Dict[str, Any]] = {}
 CANDIDATE_CACHE_TTL = int(os.getenv("COHORT_CACHE_TTL_SECONDS", "180"))
@@ -279,13 +281,13 @@ def normalize_color(value: Optional[str]) -> Optional[str]:
         return None
     lowered = strip_accents(text).lower()
     lowered = lowered.replace("-", " ")
-    lowered = re.sub(r"\s+", " ", lowered).strip()
+    lowered = WHITESPACE_RUN.sub(" ", lowered).strip()
 
     if lowered in COLOR_CANONICAL_MAP:
         return COLOR_CANONICAL_MAP[lowered]
 
     # Try splitting composite values (e.g., "schwarz / weiß")
-    for part in re.split(r"[\/,;]| und | with ", lowered):
+    for part in COLOR_PART_SPLIT.split(lowered):
         part = part.strip()
         if not part:
             continue
@@ -180,7 +180,9 @@ class VehicleDatabase:
         try:
             self.check_schema_exist()
             self.create_table_if_not_exists()
+            self.create_derived_columns()
             self.create_indexes()
+            self.create_stats_view()
             self.log.info("Database initialization completed successfully")
         except Exception as e:
             self.log.error(f"ERROR: Database initialization failed: {e}")
@@ -270,6 +272,72 @@ class VehicleDatabase:
             if conn:
                 self._put_connection(conn)
 
+    # Numeric views of the raw text columns, computed once on write so readers
+    # (the ranking API) don't REGEXP_REPLACE every row they scan.
+    DERIVED_COLUMNS = [
+        ("price_num",
+         "DOUBLE PRECISION GENERATED ALWAYS AS "
+         "(CAST(NULLIF(REGEXP_REPLACE(price, '[^0-9]', '', 'g'), '') AS DOUBLE PRECISION)) STORED"),
+        ("mileage_num",
+         "DOUBLE PRECISION GENERATED ALWAYS AS "
+         "(CAST(NULLIF(REGEXP_REPLACE(COALESCE(mileage_km, ''), '[^0-9]', '', 'g'), '') AS DOUBLE PRECISION)) STORED"),
+        ("registration_year",
+         "SMALLINT GENERATED ALWAYS AS "
+         "(CAST(SUBSTRING(first_registration_raw FROM '[0-9]{4}') AS SMALLINT)) STORED"),
+    ]
+
+    def create_derived_columns(self):
+        """Add generated numeric columns derived from raw scraped text.
+
+        Only missing columns are ALTERed: ALTER TABLE takes an ACCESS EXCLUSIVE
+        lock before it looks at IF NOT EXISTS, which would stall API readers on
+        every scraper start. Adding a stored generated column rewrites the
+        whole table, so all missing columns go into one ALTER TABLE and the
+        table is rewritten once rather than once per column.
+        """
+        conn = None
+        cursor = None
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute(
+                "SELECT column_name FROM information_schema.columns WHERE table_schema = %s AND table_name = %s",
+                (self.schema_name, self.table_name)
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+
+            missing = [(column, definition) for column, definition in self.DERIVED_COLUMNS if column not in existing]
+            if missing:
+                self.log.info(
+                    f"Adding derived columns {', '.join(column for column, _ in missing)} "
+                    f"(rewrites {self.schema_name}.{self.table_name})"
+                )
+                cursor.execute(
+                    sql.SQL("ALTER TABLE {}.{} {}").format(
+                        sql.Identifier(self.schema_name),
+                        sql.Identifier(self.table_name),
+                        sql.SQL(", ").join(
+                            sql.SQL("ADD COLUMN IF NOT EXISTS {} {}").format(sql.Identifier(column), sql.SQL(definition))
+                            for column, definition in missing
+                        ),
+                    )
+                )
+
+            conn.commit()
+            self.log.info("Derived columns checked/created successfully")
+
+        except Exception as e:
+            self.log.error(f"ERROR: Failed to create derived columns: {e}")
+            if conn:
+                conn.rollback()
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                self._put_connection(conn)
+
     def create_indexes(self):
         """Create indexes on important columns (including updated_at, scraped_at, availability)."""
         conn = None
@@ -314,6 +382,14 @@ class VehicleDatabase:
                 ).format(sql.SQL(self.table_name),
                          sql.Identifier(self.schema_name),
                          sql.Identifier(self.table_name)),
+                # Matches the comparables query's price / year / mileage windows in the API
+                sql.SQL(
+                    "CREATE INDEX IF NOT EXISTS idx_{}_candidate_windows ON {}.{} "
+                    "(make, model, COALESCE(price_num, -1), COALESCE(registration_year, -1), COALESCE(mileage_num, 0)) "
+                    "WHERE is_vehicle_available"
+                ).format(sql.SQL(self.table_name),
+                         sql.Identifier(self.schema_name),
+                         sql.Identifier(self.table_name)),
             ]
 
             for query in index_queries:
@@ -333,6 +409,89 @@ class VehicleDatabase:
             if conn:
                 self._put_connection(conn)
 
+    def create_stats_view(self):
+        """Create the single-row vehicle_stats materialized view read by the API's /stats.
+
+        The constant ``id`` column carries a unique index so the view can be
+        refreshed with REFRESH MATERIALIZED VIEW CONCURRENTLY.
+        """
+        conn = None
+        cursor = None
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute(
+                sql.SQL(
+                    "CREATE MATERIALIZED VIEW IF NOT EXISTS {}.vehicle_stats AS "
+                    "SELECT 1 AS id, "
+                    "COUNT(*) FILTER (WHERE is_vehicle_available) AS total_vehicles, "
+                    "COUNT(DISTINCT make) AS unique_makes, "
+                    "COUNT(DISTINCT data_source) AS data_sources, "
+                    "NOW() AS refreshed_at "
+                    "FROM {}.{}"
+                ).format(sql.Identifier(self.schema_name),
+                         sql.Identifier(self.schema_name),
+                         sql.Identifier(self.table_name))
+            )
+            cursor.execute(
+                sql.SQL(
+                    "CREATE UNIQUE INDEX IF NOT EXISTS idx_vehicle_stats_id ON {}.vehicle_stats (id)"
+                ).format(sql.Identifier(self.schema_name))
+            )
+
+            conn.commit()
+            self.log.info("Stats materialized view checked/created successfully")
+
+        except Exception as e:
+            self.log.error(f"ERROR: Failed to create stats view: {e}")
+            if conn:
+                conn.rollback()
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                self._put_connection(conn)
+
+    # Shared with the ranking API's refresh_stats_view(): whoever holds it is
+    # already refreshing vehicle_stats, so nobody else needs to.
+    STATS_REFRESH_LOCK_ID = 0x43524D53
+
+    def refresh_stats_view(self):
+        """Refresh vehicle_stats after a scraping run so /stats reflects its writes.
+
+        Skipped when another session (the API or a parallel scraper) holds the
+        refresh advisory lock; failures are logged, never raised.
+        """
+        conn = None
+        cursor = None
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", (self.STATS_REFRESH_LOCK_ID,))
+            if not cursor.fetchone()[0]:
+                self.log.info("Stats view refresh already running elsewhere, skipping")
+            else:
+                cursor.execute(
+                    sql.SQL("REFRESH MATERIALIZED VIEW CONCURRENTLY {}.vehicle_stats").format(
+                        sql.Identifier(self.schema_name)
+                    )
+                )
+                self.log.info("Stats materialized view refreshed")
+            conn.commit()
+
+        except Exception as e:
+            self.log.error(f"ERROR: Failed to refresh stats view: {e}")
+            if conn:
+                conn.rollback()
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                self._put_connection(conn)
+
     def generate_unique_id(self, vehicle_id: str, data_source: str) -> str:
         return f"{vehicle_id}_{data_source}"
 
@@ -514,6 +514,7 @@ class AutoScout24Scraper:
 
         elapsed_time = time.time() - start_time
         self.db_obj.mark_unavailable_before(start_date, 'autoscout24')
+        self.db_obj.refresh_stats_view()
         # self.log. final statistics
         self.log.info(f"\n{'=' * 60}")
         self.log.info("📊 SCRAPING COMPLETED")
@@ -438,6 +438,7 @@ class AutoScout24HourlyScraper:
             self.log.error(f"❌ Error during scraping: {str(e)[:200]}")
 
         elapsed_time = time.time() - start_time
+        self.db_obj.refresh_stats_view()
 
         # self.log. final statistics
         self.log.info(f"\n{'=' * 60}")
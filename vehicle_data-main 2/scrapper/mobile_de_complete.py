@@ -469,6 +469,7 @@ class MobileDeScraper:
 
         elapsed_time = time.time() - start_time
         self.db_obj.mark_unavailable_before(start_date, 'mobile')
+        self.db_obj.refresh_stats_view()
         # self.log. final statistics
         self.log.info(f"\n{'=' * 60}")
         self.log.info("📊 SCRAPING COMPLETED")
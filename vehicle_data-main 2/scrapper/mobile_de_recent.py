@@ -395,6 +395,7 @@ class MobileDeHourlyScraper:
             self.log.info(f"❌ Error during scraping: {str(e)[:200]}")
 
         elapsed_time = time.time() - start_time
+        self.db_obj.refresh_stats_view()
 
         # self.log.info final statistics
         self.log.info(f"\n{'=' * 60}")